@@ -807,11 +807,11 @@ def create_sidebar():
             
             # Quick stats
             try:
-                from utils.database import get_books_by_user, get_summaries_by_user
+                from utils.database import get_books_by_user, count_summaries_by_user
                 user_id = st.session_state.user_id
                 
                 books = get_books_by_user(user_id, limit=100)
-                summaries = get_summaries_by_user(user_id)
+                summary_count = count_summaries_by_user(user_id)
                 
                 st.markdown('<p style="color: rgba(255,255,255,0.7); font-size: 0.8rem; margin-bottom: 0.5rem;">QUICK STATS</p>', unsafe_allow_html=True)
                 
@@ -827,7 +827,7 @@ def create_sidebar():
                 with col2:
                     st.markdown(f"""
                     <div style="background:rgba(255,255,255,0.1); padding:0.75rem; border-radius:10px; text-align:center;">
-                        <div style="font-size:1.5rem; color:white;">{len(summaries) if summaries else 0}</div>
+                        <div style="font-size:1.5rem; color:white;">{summary_count}</div>
                         <div style="font-size:0.7rem; color:rgba(255,255,255,0.7);">Summaries</div>
                     </div>
                     """, unsafe_allow_html=True)
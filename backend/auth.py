@@ -1,37 +1,317 @@
 # backend/auth.py - COMPLETE UPDATED VERSION
 import os
-import re
+import hmac
+import base64
+import time
+import hashlib
+import logging
+import secrets
+import threading
 import bcrypt
 import jwt
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from typing import Optional
 from bson import ObjectId
+try:
+    from argon2 import PasswordHasher as _Argon2PasswordHasher, extract_parameters as _argon2_parameters
+    from argon2.exceptions import VerifyMismatchError
+    from argon2.low_level import Type as _Argon2Type
+except ImportError:
+    _Argon2PasswordHasher = None
+from utils.database import db as _db, get_user_by_email, get_user_by_id, EMAIL_COLLATION
+from utils.validation import (
+    MAX_EMAIL_LENGTH, MIN_PASSWORD_LENGTH, MAX_PASSWORD_LENGTH,
+    is_valid_password, validate_registration
+)
 
 # Configuration
 SECRET_KEY = os.getenv("JWT_SECRET", "your-super-secret-jwt-key-change-in-production")
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_HOURS = 24
 
+# User document fields read by login_user
+LOGIN_USER_FIELDS = (
+    "_id", "name", "email", "role", "is_active",
+    "created_at", "last_login", "password_hash"
+)
+
+logger = logging.getLogger(__name__)
 
 # =========================
 # PASSWORD HANDLING
 # =========================
+def calibrate_bcrypt_rounds(target_ms=300, candidates=(10, 11, 12, 13)):
+    """Return the highest bcrypt cost whose hash time stays within target_ms"""
+    selected = candidates[0]
+    for rounds in candidates:
+        start = time.perf_counter()
+        bcrypt.hashpw(b"calibration-password", bcrypt.gensalt(rounds=rounds))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if elapsed_ms > target_ms:
+            break
+        selected = rounds
+    return selected
+
+
+# Set BCRYPT_ROUNDS=auto to pick the cost for this host at startup
+_rounds_setting = os.getenv("BCRYPT_ROUNDS", "12")
+BCRYPT_ROUNDS = calibrate_bcrypt_rounds() if _rounds_setting == "auto" else int(_rounds_setting)
+# Covers queueing plus one hash. bcrypt doubles its work per round, so the
+# allowance doubles with each round above the default cost of 12.
+HASH_TIMEOUT_SECONDS = 10 * 2 ** max(0, BCRYPT_ROUNDS - 12)
+HASH_BUSY_MESSAGE = "The server is busy right now. Please try again in a moment."
+
+# Password hashing runs outside the GIL (bcrypt and argon2 both release it), so
+# a pool sized to the CPU count lets concurrent logins run on separate cores
+# while capping how many run at once.
+_HASH_POOL = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="hasher")
+
+
+class HashingBusyError(RuntimeError):
+    """The hashing pool did not produce a result within HASH_TIMEOUT_SECONDS"""
+
+
+def _run_on_hash_pool(fn, *args):
+    """Run fn on the hashing pool, cancelling it if it is still queued at the timeout"""
+    future = _HASH_POOL.submit(fn, *args)
+    try:
+        return future.result(timeout=HASH_TIMEOUT_SECONDS)
+    except FutureTimeoutError:
+        # Drop queued work instead of letting it add to the backlog
+        future.cancel()
+        raise HashingBusyError(f"password hashing did not finish within {HASH_TIMEOUT_SECONDS}s")
+
+if int(bcrypt.__version__.split(".")[0]) < 4:
+    logger.warning(
+        "bcrypt %s uses the slower legacy C backend; upgrade to bcrypt>=4.1",
+        bcrypt.__version__
+    )
+
+
+# bcrypt.gensalt() makes one os.urandom(16) syscall per hash. Salts are built
+# the same way here from a per-thread 4 KiB urandom buffer (256 salts per
+# syscall). The buffer is refilled after fork so processes never share salts.
+SALT_POOL_BYTES = 4096
+_BCRYPT_B64 = bytes.maketrans(
+    b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/",
+    b"./ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+)
+_salt_pool = threading.local()
+
+
+def _next_salt(rounds):
+    """Equivalent of bcrypt.gensalt(rounds) drawing from the per-thread entropy pool"""
+    pos = getattr(_salt_pool, "pos", SALT_POOL_BYTES)
+    if pos + 16 > SALT_POOL_BYTES or getattr(_salt_pool, "pid", None) != os.getpid():
+        _salt_pool.buf = os.urandom(SALT_POOL_BYTES)
+        _salt_pool.pid = os.getpid()
+        pos = 0
+    _salt_pool.pos = pos + 16
+    encoded = base64.b64encode(_salt_pool.buf[pos:pos + 16]).translate(_BCRYPT_B64)[:22]
+    return b"$2b$%02d$" % rounds + encoded
+
+
+class _BcryptHasher:
+    """bcrypt password hashes ($2b$...)"""
+    name = "bcrypt"
+
+    def hash(self, password):
+        salt = _next_salt(BCRYPT_ROUNDS)
+        return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
+    def verify(self, password, stored_hash):
+        return bcrypt.checkpw(password.encode('utf-8'), stored_hash.encode('utf-8'))
+
+
+class _Argon2Hasher:
+    """Argon2id password hashes ($argon2id$...), requires argon2-cffi"""
+    name = "argon2"
+
+    def __init__(self):
+        if _Argon2PasswordHasher is None:
+            raise ImportError("argon2-cffi is not installed")
+        self._hasher = _Argon2PasswordHasher(type=_Argon2Type.ID)
+
+    def hash(self, password):
+        return self._hasher.hash(password)
+
+    def verify(self, password, stored_hash):
+        try:
+            return self._hasher.verify(stored_hash, password)
+        except VerifyMismatchError:
+            return False
+
+
+def _select_hasher(name):
+    """Build the hasher named by AUTH_HASHER, falling back to bcrypt"""
+    if name == "argon2":
+        try:
+            return _Argon2Hasher()
+        except ImportError:
+            logger.warning("AUTH_HASHER=argon2 but argon2-cffi is not installed; using bcrypt")
+    return _BcryptHasher()
+
+
+HASHER = _select_hasher(os.getenv("AUTH_HASHER", "bcrypt").strip().lower())
+logger.info("Password hasher: %s", HASHER.name)
+
+# Logins for unknown emails are verified against a hash of a random throwaway
+# password so they cost the same as a wrong password for a real account and
+# response time does not reveal which emails are registered. Stored hashes can
+# differ from HASHER (AUTH_HASHER was switched, BCRYPT_ROUNDS changed or was
+# calibrated), so the dummy follows the scheme and cost of the last real hash
+# login checked; until then it uses HASHER. Dummies are computed on the hashing
+# pool so neither import nor login waits for a new one.
+_dummy_hash_futures = {None: _HASH_POOL.submit(HASHER.hash, secrets.token_urlsafe(16))}
+_dummy_hash_params = None
+
+
+def _hash_params(stored_hash):
+    """Scheme and cost prefix of stored_hash, e.g. '$2b$12' or '$argon2id$v=19$m=65536,t=3,p=4'"""
+    if not isinstance(stored_hash, str):
+        return None
+    if stored_hash.startswith("$argon2"):
+        return stored_hash.rsplit("$", 2)[0]
+    if stored_hash.startswith("$2"):
+        return stored_hash[:6]
+    return None
+
+
+def _make_dummy_hash(stored_hash):
+    """Hash a throwaway password with the same scheme and cost as stored_hash"""
+    password = secrets.token_urlsafe(16)
+    if stored_hash.startswith("$argon2"):
+        if _Argon2PasswordHasher is None:
+            raise ImportError("argon2-cffi is not installed")
+        hasher = _Argon2PasswordHasher.from_parameters(_argon2_parameters(stored_hash))
+        return hasher.hash(password)
+    rounds = int(stored_hash.split("$")[2])
+    return bcrypt.hashpw(password.encode('utf-8'), _next_salt(rounds)).decode('utf-8')
+
+
+def _track_dummy_params(stored_hash):
+    """Point unknown-email logins at a dummy matching stored_hash's scheme and cost"""
+    global _dummy_hash_params
+    params = _hash_params(stored_hash)
+    if params is None or params == _dummy_hash_params:
+        return
+    if params not in _dummy_hash_futures:
+        _dummy_hash_futures[params] = _HASH_POOL.submit(_make_dummy_hash, stored_hash)
+    _dummy_hash_params = params
+
+
+def _dummy_hash():
+    """Dummy hash for unknown emails; built synchronously if the pooled one failed"""
+    params = _dummy_hash_params
+    future = _dummy_hash_futures.get(params, _dummy_hash_futures[None])
+    try:
+        return future.result(timeout=HASH_TIMEOUT_SECONDS)
+    except FutureTimeoutError:
+        # Still queued behind real work; building another would only add to it
+        raise HashingBusyError("dummy password hash is not ready")
+    except Exception as e:
+        logger.warning("Dummy password hash unavailable (%s); building it synchronously", e)
+        dummy = HASHER.hash(secrets.token_urlsafe(16))
+        replacement = Future()
+        replacement.set_result(dummy)
+        _dummy_hash_futures[params] = replacement
+        return dummy
+
+
+# Hashers for stored hashes of the scheme HASHER does not produce, built on
+# first use and kept for later verifies
+_legacy_hashers = {}
+
+
+def _hasher_for(stored_hash):
+    """Pick the hasher that produced stored_hash so switching AUTH_HASHER keeps old logins working"""
+    is_argon2 = stored_hash.startswith("$argon2")
+    if is_argon2 == isinstance(HASHER, _Argon2Hasher):
+        return HASHER
+    hasher_class = _Argon2Hasher if is_argon2 else _BcryptHasher
+    hasher = _legacy_hashers.get(hasher_class)
+    if hasher is None:
+        hasher = _legacy_hashers.setdefault(hasher_class, hasher_class())
+    return hasher
+
+
 def hash_password(password: str) -> str:
-    """Hash a password for storing"""
-    salt = bcrypt.gensalt()
-    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+    """Hash a password for storing; raises HashingBusyError if the pool is backed up"""
+    return _run_on_hash_pool(HASHER.hash, password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a stored password against a plain password"""
+    """
+    Verify a stored password against a plain password.
+    Raises HashingBusyError if the pool is backed up, so callers can tell an
+    overloaded server from a wrong password.
+    """
+    if len(plain_password) > MAX_PASSWORD_LENGTH:
+        return False
     try:
-        return bcrypt.checkpw(
-            plain_password.encode('utf-8'),
-            hashed_password.encode('utf-8')
-        )
+        hasher = _hasher_for(hashed_password)
+        return _run_on_hash_pool(hasher.verify, plain_password, hashed_password)
+    except HashingBusyError:
+        raise
     except Exception:
         return False
 
 
+# =========================
+# VERIFIED LOGIN CACHE
+# =========================
+# Streamlit reruns and double-submits repeat the same correct login within
+# seconds; remembering a successful verification briefly skips the repeated
+# hash. Only successes are cached, entries are keyed by an HMAC of the password
+# (never the password itself) and are only honoured while the user's stored
+# password_hash is unchanged.
+LOGIN_CACHE_TTL_SECONDS = 60
+LOGIN_CACHE_MAX_ENTRIES = 2048
+_LOGIN_CACHE_PEPPER = os.getenv("AUTH_CACHE_PEPPER", "").encode('utf-8') or secrets.token_bytes(32)
+_login_cache = OrderedDict()  # (email, password digest) -> (password_hash, expires_at)
+_login_cache_lock = threading.Lock()
+
+
+def _login_cache_key(email, password):
+    digest = hmac.new(_LOGIN_CACHE_PEPPER, password.encode('utf-8'), hashlib.sha256).digest()
+    return email.strip().lower(), digest
+
+
+def _is_cached_login(key, password_hash):
+    """Check for an unexpired verification of this password against password_hash"""
+    with _login_cache_lock:
+        entry = _login_cache.get(key)
+        if entry is None:
+            return False
+        cached_hash, expires_at = entry
+        if cached_hash != password_hash or expires_at < time.monotonic():
+            del _login_cache[key]
+            return False
+        _login_cache.move_to_end(key)
+        return True
+
+
+def _cache_login(key, password_hash):
+    with _login_cache_lock:
+        _login_cache[key] = (password_hash, time.monotonic() + LOGIN_CACHE_TTL_SECONDS)
+        _login_cache.move_to_end(key)
+        while len(_login_cache) > LOGIN_CACHE_MAX_ENTRIES:
+            _login_cache.popitem(last=False)
+
+
+def invalidate_login_cache(email):
+    """Forget cached logins for email (on logout or password change)"""
+    if not email:
+        return
+    email = email.strip().lower()
+    with _login_cache_lock:
+        for key in [key for key in _login_cache if key[0] == email]:
+            del _login_cache[key]
+
+
 # =========================
 # JWT TOKEN HANDLING
 # =========================
@@ -60,66 +340,26 @@ def verify_token(token):
         return None
 
 
-# =========================
-# VALIDATION FUNCTIONS
-# =========================
-def is_valid_email(email):
-    """Validate email format"""
-    email = (email or "").strip().lower()
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
-
-
-def is_valid_name(name):
-    """Validate name format"""
-    if not name or len(name.strip()) < 2:
-        return False
-    pattern = r'^[A-Za-z\s\-\']+$'
-    return re.match(pattern, name.strip()) is not None
-
-
-def is_valid_password(password):
-    """Validate password strength"""
-    if len(password) < 8:
-        return False, "Password must be at least 8 characters"
-    if not any(c.isupper() for c in password):
-        return False, "Password must contain at least one uppercase letter"
-    if not any(c.isdigit() for c in password):
-        return False, "Password must contain at least one number"
-    return True, "Password is valid"
-
-
 # =========================
 # USER REGISTRATION
 # =========================
-def register_user(name, email, password, role="user"):
-    """Register a new user"""
+def register_user(name, email, password, role="user", pre_validated=False):
+    """
+    Register a new user.
+    Pass pre_validated=True when the caller already ran validate_registration
+    on the same input in this process, to skip validating it twice.
+    """
     try:
-        # Import inside function to avoid circular imports
-        from utils.database import db
-        
-        # Validate inputs
-        if not is_valid_email(email):
-            return {
-                "success": False,
-                "message": "Invalid email format"
-            }
-        
-        if not is_valid_name(name):
-            return {
-                "success": False,
-                "message": "Invalid name format. Name must be at least 2 characters and contain only letters, spaces, hyphens, and apostrophes"
-            }
-        
-        is_pass_valid, pass_msg = is_valid_password(password)
-        if not is_pass_valid:
-            return {
-                "success": False,
-                "message": pass_msg
-            }
+        if not pre_validated:
+            errors = validate_registration(name, email, password)
+            if errors:
+                return {
+                    "success": False,
+                    "message": errors[0]
+                }
         
         # Check if user already exists
-        existing_user = db.users.find_one({"email": email.lower()})
+        existing_user = _db.users.find_one({"email": email}, collation=EMAIL_COLLATION)
         if existing_user:
             return {
                 "success": False,
@@ -140,7 +380,7 @@ def register_user(name, email, password, role="user"):
         }
         
         # Insert into database
-        result = db.users.insert_one(user_data)
+        result = _db.users.insert_one(user_data)
         
         # Create token
         token = create_token(result.inserted_id, email, role)
@@ -152,6 +392,12 @@ def register_user(name, email, password, role="user"):
             "message": "Registration successful"
         }
         
+    except HashingBusyError:
+        return {
+            "success": False,
+            "busy": True,
+            "message": HASH_BUSY_MESSAGE
+        }
     except Exception as e:
         return {
             "success": False,
@@ -162,12 +408,47 @@ def register_user(name, email, password, role="user"):
 # =========================
 # USER LOGIN
 # =========================
+@dataclass(slots=True)
+class UserSafe:
+    """Public view of an authenticated user, as returned by login_user"""
+    user_id: str
+    name: str
+    email: str
+    role: str
+    is_active: bool
+    created_at: Optional[datetime]
+    last_login: Optional[datetime]
+    token: str
+
+    @property
+    def id(self):
+        """Compatibility alias for user_id"""
+        return self.user_id
+
+    def get(self, key, default=None):
+        """dict-style lookup for callers written against the old response dict"""
+        if key == "id" or key in self.__slots__:
+            return getattr(self, key)
+        return default
+
+    def to_dict(self):
+        """Plain dict (including the 'id' alias) for session state or JSON"""
+        return {
+            "id": self.user_id,
+            "user_id": self.user_id,
+            "name": self.name,
+            "email": self.email,
+            "role": self.role,
+            "is_active": self.is_active,
+            "created_at": self.created_at,
+            "last_login": self.last_login,
+            "token": self.token,
+        }
+
+
 def login_user(email, password):
     """Authenticate user login"""
     try:
-        # Import inside function to avoid circular imports
-        from utils.database import get_user_by_email
-        
         # Validate email
         if not email or not password:
             return {
@@ -175,9 +456,22 @@ def login_user(email, password):
                 "message": "Email and password are required"
             }
         
+        # Registration enforces the password length bounds, so credentials
+        # outside them can never match. The check does not depend on whether
+        # the account exists, so skipping the lookup and hash leaks nothing.
+        if (
+            len(email) > MAX_EMAIL_LENGTH
+            or not MIN_PASSWORD_LENGTH <= len(password) <= MAX_PASSWORD_LENGTH
+        ):
+            return {
+                "success": False,
+                "message": "Invalid email or password"
+            }
+        
         # Get user from database
-        user = get_user_by_email(email.lower())
+        user = get_user_by_email(email, fields=LOGIN_USER_FIELDS)
         if not user:
+            verify_password(password, _dummy_hash())
             return {
                 "success": False,
                 "message": "Invalid email or password"
@@ -191,34 +485,37 @@ def login_user(email, password):
             }
         
         # Verify password
-        if not verify_password(password, user.get("password_hash", "")):
-            return {
-                "success": False,
-                "message": "Invalid email or password"
-            }
+        password_hash = user.get("password_hash", "")
+        _track_dummy_params(password_hash)
+        cache_key = _login_cache_key(email, password)
+        if not _is_cached_login(cache_key, password_hash):
+            if not verify_password(password, password_hash):
+                return {
+                    "success": False,
+                    "message": "Invalid email or password"
+                }
+            _cache_login(cache_key, password_hash)
         
         # Update last login
-        from utils.database import db
-        db.users.update_one(
-            {"_id": user["_id"]},
+        _db.users.update_one(
+            {"_id": ObjectId(user["_id"])},
             {"$set": {"last_login": datetime.utcnow()}}
         )
         
         # Create token
         token = create_token(user["_id"], user["email"], user.get("role", "user"))
         
-        # Prepare user response
-        user_response = {
-            "user_id": str(user["_id"]),
-            "id": str(user["_id"]),  # Compatibility field
-            "name": user.get("name", user["email"].split("@")[0]),
-            "email": user["email"],
-            "role": user.get("role", "user"),
-            "is_active": user.get("is_active", True),
-            "created_at": user.get("created_at"),
-            "last_login": user.get("last_login"),
-            "token": token
-        }
+        user_id = str(user["_id"])
+        user_response = UserSafe(
+            user_id=user_id,
+            name=user.get("name", user["email"].split("@")[0]),
+            email=user["email"],
+            role=user.get("role", "user"),
+            is_active=user.get("is_active", True),
+            created_at=user.get("created_at"),
+            last_login=user.get("last_login"),
+            token=token
+        )
         
         return {
             "success": True,
@@ -226,6 +523,12 @@ def login_user(email, password):
             "message": "Login successful"
         }
         
+    except HashingBusyError:
+        return {
+            "success": False,
+            "busy": True,
+            "message": HASH_BUSY_MESSAGE
+        }
     except Exception as e:
         return {
             "success": False,
@@ -238,6 +541,8 @@ def login_user(email, password):
 # =========================
 def set_user_session(session, user):
     """Set user session data"""
+    if isinstance(user, UserSafe):
+        user = user.to_dict()
     session["logged_in"] = True
     session["user_id"] = user["user_id"]
     session["username"] = user.get("name", user["email"].split("@")[0])
@@ -249,6 +554,7 @@ def set_user_session(session, user):
 
 def clear_user_session(session):
     """Clear user session data"""
+    invalidate_login_cache(session.get("email"))
     session.clear()
     session["logged_in"] = False
 
@@ -262,8 +568,6 @@ def get_current_user(session_state):
         return None
     
     try:
-        from utils.database import get_user_by_id
-        
         user_id = session_state.get("user_id")
         if not user_id:
             return None
@@ -340,8 +644,6 @@ def verify_user_token(token):
 def update_user_profile(user_id, updates):
     """Update user profile information"""
     try:
-        from utils.database import db
-        
         # Filter allowed updates
         allowed_updates = {"name", "settings"}
         filtered_updates = {k: v for k, v in updates.items() if k in allowed_updates}
@@ -354,7 +656,7 @@ def update_user_profile(user_id, updates):
         
         user_obj_id = ObjectId(user_id) if isinstance(user_id, str) else user_id
         
-        result = db.users.update_one(
+        result = _db.users.update_one(
             {"_id": user_obj_id},
             {"$set": filtered_updates}
         )
@@ -374,12 +676,10 @@ def update_user_profile(user_id, updates):
 def change_password(user_id, current_password, new_password):
     """Change user password"""
     try:
-        from utils.database import db
-        
         user_obj_id = ObjectId(user_id) if isinstance(user_id, str) else user_id
         
         # Get user
-        user = db.users.find_one({"_id": user_obj_id})
+        user = _db.users.find_one({"_id": user_obj_id})
         if not user:
             return {"success": False, "message": "User not found"}
         
@@ -393,7 +693,7 @@ def change_password(user_id, current_password, new_password):
             return {"success": False, "message": msg}
         
         # Update password
-        result = db.users.update_one(
+        result = _db.users.update_one(
             {"_id": user_obj_id},
             {
                 "$set": {
@@ -404,10 +704,13 @@ def change_password(user_id, current_password, new_password):
         )
         
         if result.modified_count > 0:
+            invalidate_login_cache(user.get("email"))
             return {"success": True, "message": "Password changed successfully"}
         else:
             return {"success": False, "message": "Failed to change password"}
             
+    except HashingBusyError:
+        return {"success": False, "busy": True, "message": HASH_BUSY_MESSAGE}
     except Exception as e:
         return {"success": False, "message": str(e)}
 
@@ -418,11 +721,9 @@ def change_password(user_id, current_password, new_password):
 def deactivate_account(user_id):
     """Deactivate user account"""
     try:
-        from utils.database import db
-        
         user_obj_id = ObjectId(user_id) if isinstance(user_id, str) else user_id
         
-        result = db.users.update_one(
+        result = _db.users.update_one(
             {"_id": user_obj_id},
             {
                 "$set": {
@@ -445,11 +746,9 @@ def deactivate_account(user_id):
 def activate_account(user_id):
     """Activate user account"""
     try:
-        from utils.database import db
-        
         user_obj_id = ObjectId(user_id) if isinstance(user_id, str) else user_id
         
-        result = db.users.update_one(
+        result = _db.users.update_one(
             {"_id": user_obj_id},
             {
                 "$set": {
@@ -4,7 +4,7 @@ from utils.database import create_indexes
 import re
 import time
 import logging
-from datetime import datetime,timedate
+from datetime import datetime, timedelta
 import bcrypt
 from pymongo.errors import DuplicateKeyError, PyMongoError
 from bson import ObjectId
@@ -1,6 +1,5 @@
 import base64
 import os
-import re
 import sys
 from datetime import datetime
 from pathlib import Path
@@ -11,14 +10,17 @@ import streamlit as st
 from frontend.api_config import API_BASE_URL, LOGIN_ENDPOINTS, REGISTER_ENDPOINTS
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.validation import validate_registration
+
 LOCAL_AUTH_IMPORT_ERROR = None
 
 try:
-    from backend.auth import register_user, login_user
+    from backend.auth import register_user, login_user, invalidate_login_cache
 except ImportError as e:
     LOCAL_AUTH_IMPORT_ERROR = str(e)
     register_user = None
     login_user = None
+    invalidate_login_cache = None
 
 
 def _post_to_backend(candidate_paths, payload):
@@ -72,9 +74,7 @@ def _local_auth_unavailable_response():
     return {"success": False, "message": message}
 
 
-def load_auth_css():
-    """Load polished styling for login and signup pages."""
-    css = """
+_AUTH_CSS_SOURCE = """
     <style>
     .stApp {
         background:
@@ -360,30 +360,20 @@ def load_auth_css():
         }
     }
     </style>
-    """
-    st.markdown(css, unsafe_allow_html=True)
-
-
-def validate_registration(name, email, password, confirm):
-    """Validate registration inputs."""
-    errors = []
-    clean_name = name.strip()
-    clean_email = email.strip().lower()
-
-    if len(clean_name) < 2:
-        errors.append("Name must be at least 2 characters")
-    if not re.match(r"^[A-Za-z\s\-']+$", clean_name):
-        errors.append("Name must contain only letters, spaces, hyphens, and apostrophes")
-    if not re.fullmatch(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[A-Za-z]{2,}", clean_email):
-        errors.append("Invalid email format")
-    if len(password) < 8:
-        errors.append("Password must be at least 8 characters")
-    if password != confirm:
-        errors.append("Passwords do not match")
-    return errors
-
-
-def perform_registration(name, email, password):
+"""
+
+# Built once at import: Streamlit re-executes the page script on every
+# interaction, so only the emission below should happen per rerun, and
+# dropping indentation and blank lines trims the payload sent each time.
+AUTH_CSS = "\n".join(line.strip() for line in _AUTH_CSS_SOURCE.splitlines() if line.strip())
+
+
+def load_auth_css():
+    """Load polished styling for login and signup pages."""
+    st.markdown(AUTH_CSS, unsafe_allow_html=True)
+
+
+def perform_registration(name, email, password, pre_validated=False):
     """Perform user registration with error handling."""
     try:
         remote_result = _post_to_backend(
@@ -400,7 +390,7 @@ def perform_registration(name, email, password):
         elif "No matching auth endpoint found" in remote_result.get("message", "") or "Remote backend unavailable" in remote_result.get("message", ""):
             if register_user is None:
                 return _local_auth_unavailable_response()
-            result = register_user(name.strip(), email, password)
+            result = register_user(name.strip(), email, password, pre_validated=pre_validated)
         else:
             result = remote_result
 
@@ -449,6 +439,9 @@ def perform_login(email, password):
 
         if result.get("success"):
             user = result["user"]
+            if hasattr(user, "to_dict"):
+                # Local backend returns a UserSafe; session state keeps plain dicts
+                user = user.to_dict()
             st.session_state.logged_in = True
             st.session_state.user = user
             st.session_state.user_id = user.get("user_id") or user.get("id")
@@ -601,7 +594,7 @@ def registration_page():
             return
 
         with st.spinner("Creating account..."):
-            result = perform_registration(name.strip(), email.strip(), password)
+            result = perform_registration(name.strip(), email.strip(), password, pre_validated=True)
             if result.get("success"):
                 st.success("Account created successfully!")
                 st.session_state.page = "login"
@@ -642,6 +635,8 @@ def logout_user():
         user_id = st.session_state.get("user_id")
         if user_id:
             ErrorLogger.log_user_action("user_logout", user_id=user_id, success=True)
+        if invalidate_login_cache is not None:
+            invalidate_login_cache(st.session_state.get("email"))
     except Exception:
         pass
 
@@ -657,7 +652,6 @@ def logout_user():
 
 def simple_auth_page():
     """Simple unified auth page."""
-    load_auth_css()
     query_params = st.query_params if hasattr(st, "query_params") else st.experimental_get_query_params()
     mode = query_params.get("mode", ["login"])[0]
 
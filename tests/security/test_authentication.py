@@ -41,6 +41,41 @@ class TestSecurityFeatures:
         
         print("✅ Rate limiting tested")
     
+    def test_rate_limit_window_expiry(self, monkeypatch):
+        """Test that the limit lifts once the oldest attempt leaves the window"""
+        from utils.error_handler import RateLimiter
+        import utils.error_handler as error_handler
+        
+        now = [1000.0]
+        monkeypatch.setattr(error_handler.time, "time", lambda: now[0])
+        limiter = RateLimiter(max_requests=3, time_window=60)
+        
+        for _ in range(3):
+            assert limiter.is_allowed("10.0.0.1")
+            now[0] += 1
+        assert not limiter.is_allowed("10.0.0.1")
+        assert limiter.get_retry_after("10.0.0.1") == 57
+        
+        now[0] = 1060.0
+        assert limiter.is_allowed("10.0.0.1")
+        assert not limiter.is_allowed("10.0.0.1")
+        
+        # Idle users are purged on the next sweep
+        now[0] += RateLimiter.SWEEP_INTERVAL
+        limiter.is_allowed("10.0.0.2")
+        assert "10.0.0.1" not in limiter.requests
+    
+    def test_rate_limit_concurrent_attempts(self):
+        """Test that concurrent attempts cannot exceed the limit"""
+        from concurrent.futures import ThreadPoolExecutor
+        from utils.error_handler import RateLimiter
+        
+        limiter = RateLimiter(max_requests=5, time_window=300)
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(lambda _: limiter.is_allowed("10.0.0.3"), range(200)))
+        
+        assert results.count(True) == 5
+    
     def test_sql_injection_prevention(self):
         """Test SQL/MongoDB injection prevention"""
         # Test with malicious inputs
@@ -0,0 +1,216 @@
+import pytest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+
+class TestPasswordHashing:
+    
+    def test_hash_and_verify_roundtrip(self, monkeypatch):
+        """Test hashing through the bcrypt pool"""
+        import backend.auth as auth
+        monkeypatch.setattr(auth, "BCRYPT_ROUNDS", 4)
+        
+        hashed = auth.hash_password("Secret123")
+        
+        assert hashed.startswith("$2b$04$")
+        assert auth.verify_password("Secret123", hashed)
+        assert not auth.verify_password("Wrong123", hashed)
+        assert not auth.verify_password("Secret123", "not-a-hash")
+    
+    def test_calibrate_bcrypt_rounds(self):
+        """Test that calibration respects the latency target"""
+        from backend.auth import calibrate_bcrypt_rounds
+        
+        assert calibrate_bcrypt_rounds(target_ms=60_000, candidates=(4, 5)) == 5
+        assert calibrate_bcrypt_rounds(target_ms=0, candidates=(4, 5)) == 4
+    
+    def test_argon2_hasher_verifies_both_formats(self, monkeypatch):
+        """Test that switching to argon2 keeps bcrypt hashes verifiable"""
+        pytest.importorskip("argon2")
+        import backend.auth as auth
+        monkeypatch.setattr(auth, "BCRYPT_ROUNDS", 4)
+        bcrypt_hash = auth.hash_password("Secret123")
+        
+        monkeypatch.setattr(auth, "HASHER", auth._select_hasher("argon2"))
+        argon2_hash = auth.hash_password("Secret123")
+        
+        assert argon2_hash.startswith("$argon2id$")
+        assert auth.verify_password("Secret123", argon2_hash)
+        assert not auth.verify_password("Wrong123", argon2_hash)
+        assert auth.verify_password("Secret123", bcrypt_hash)
+        assert auth._hasher_for(bcrypt_hash) is auth._hasher_for(bcrypt_hash)
+
+
+class TestLogin:
+    
+    @pytest.fixture
+    def registered_user(self, monkeypatch):
+        import backend.auth as auth
+        from datetime import datetime
+        monkeypatch.setattr(auth, "BCRYPT_ROUNDS", 4)
+        
+        email = f"login_{datetime.now().timestamp()}@test.com"
+        result = auth.register_user("Login Tester", email, "Secret123")
+        assert result["success"]
+        return email
+    
+    def test_login_success(self, registered_user):
+        """Test that a registered user can log in"""
+        from backend.auth import login_user
+        
+        result = login_user(registered_user, "Secret123")
+        
+        assert result["success"]
+        assert result["user"].email == registered_user
+        assert result["user"].token
+    
+    def test_login_user_response_converts_to_dict(self, registered_user):
+        """Test the dict view used for session state"""
+        from backend.auth import login_user
+        
+        user = login_user(registered_user, "Secret123")["user"]
+        data = user.to_dict()
+        
+        from dataclasses import fields
+        assert set(data) == {field.name for field in fields(user)} | {"id"}
+        assert data["id"] == data["user_id"] == user.id
+        assert data["email"] == user.get("email") == registered_user
+        assert user.get("missing", "default") == "default"
+        assert user.get("to_dict") is None
+    
+    def test_login_records_last_login(self, registered_user):
+        """Test that a successful login stamps last_login on the user"""
+        from backend.auth import login_user
+        from utils.database import db
+        
+        assert login_user(registered_user, "Secret123")["success"]
+        
+        assert db.users.find_one({"email": registered_user})["last_login"] is not None
+    
+    def test_login_wrong_password(self, registered_user):
+        """Test that a wrong password is rejected"""
+        from backend.auth import login_user
+        
+        result = login_user(registered_user, "Wrong1234")
+        
+        assert not result["success"]
+        assert result["message"] == "Invalid email or password"
+    
+    def test_busy_hash_pool_is_reported_and_cancelled(self, registered_user, monkeypatch):
+        """Test that a backed-up pool answers 'busy' and drops the queued verify"""
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+        import backend.auth as auth
+        
+        pool = ThreadPoolExecutor(max_workers=1)
+        release = threading.Event()
+        pool.submit(release.wait)
+        verified = []
+        monkeypatch.setattr(auth, "_HASH_POOL", pool)
+        monkeypatch.setattr(auth, "HASH_TIMEOUT_SECONDS", 0.05)
+        monkeypatch.setattr(auth.HASHER, "verify", lambda pw, stored: verified.append(pw) or True, raising=False)
+        
+        result = auth.login_user(registered_user, "Busy12345")
+        release.set()
+        pool.shutdown(wait=True)
+        
+        assert not result["success"]
+        assert result["busy"]
+        assert result["message"] == auth.HASH_BUSY_MESSAGE
+        assert verified == []
+    
+    def test_unknown_email_still_verifies_a_hash(self, monkeypatch):
+        """Test that unknown emails pay the same hashing cost as known ones"""
+        import backend.auth as auth
+        calls = []
+        monkeypatch.setattr(auth, "verify_password", lambda pw, stored: calls.append(stored) or False)
+        
+        result = auth.login_user("nobody@test.com", "Secret123")
+        
+        assert not result["success"]
+        assert result["message"] == "Invalid email or password"
+        assert calls == [auth._dummy_hash()]
+    
+    def test_dummy_hash_follows_stored_hash_cost(self, registered_user, monkeypatch):
+        """Test that the dummy matches real hashes and survives a failed build"""
+        import backend.auth as auth
+        from concurrent.futures import Future
+        
+        assert auth.login_user(registered_user, "Secret123")["success"]
+        assert auth._dummy_hash().startswith("$2b$04$")
+        
+        failed = Future()
+        failed.set_exception(RuntimeError("pool unavailable"))
+        monkeypatch.setitem(auth._dummy_hash_futures, auth._dummy_hash_params, failed)
+        assert auth._dummy_hash().startswith("$")
+        assert auth._dummy_hash_futures[auth._dummy_hash_params] is not failed
+    
+    def test_repeat_login_skips_hash_until_invalidated(self, registered_user, monkeypatch):
+        """Test that a recent successful login is reused until the cache is cleared"""
+        import backend.auth as auth
+        assert auth.login_user(registered_user, "Secret123")["success"]
+        
+        monkeypatch.setattr(auth, "verify_password", lambda pw, stored: False)
+        assert auth.login_user(registered_user, "Secret123")["success"]
+        assert not auth.login_user(registered_user, "Other1234")["success"]
+        
+        auth.invalidate_login_cache(registered_user)
+        assert not auth.login_user(registered_user, "Secret123")["success"]
+    
+    @pytest.mark.parametrize("password", ["A1" * 1_000_000, "Short1"])
+    def test_out_of_range_password_skips_lookup(self, monkeypatch, password):
+        """Test that impossible password lengths are refused before any database or hash work"""
+        import backend.auth as auth
+        monkeypatch.setattr(auth, "get_user_by_email", lambda *a, **k: pytest.fail("looked up user"))
+        monkeypatch.setattr(auth, "verify_password", lambda *a: pytest.fail("hashed password"))
+        
+        result = auth.login_user("someone@test.com", password)
+        
+        assert result == {"success": False, "message": "Invalid email or password"}
+
+
+class TestRegistration:
+    
+    def test_register_rejects_invalid_input(self):
+        """Test that register_user validates by default"""
+        from backend.auth import register_user
+        
+        result = register_user("Jane Doe", "not-an-email", "Secret123")
+        
+        assert result == {"success": False, "message": "Invalid email format"}
+    
+    def test_register_pre_validated_skips_validation(self, monkeypatch):
+        """Test that pre-validated input is not validated a second time"""
+        import backend.auth as auth
+        from datetime import datetime
+        monkeypatch.setattr(auth, "BCRYPT_ROUNDS", 4)
+        monkeypatch.setattr(auth, "validate_registration", lambda *a: pytest.fail("validated twice"))
+        
+        email = f"prevalidated_{datetime.now().timestamp()}@test.com"
+        result = auth.register_user("Jane Doe", email, "Secret123", pre_validated=True)
+        
+        assert result["success"]
+
+
+class TestSaltPool:
+    
+    def test_salts_match_gensalt_format(self):
+        """Test that pooled salts are accepted by bcrypt"""
+        import bcrypt
+        from backend.auth import _next_salt
+        
+        salt = _next_salt(4)
+        
+        assert len(salt) == len(bcrypt.gensalt(rounds=4))
+        assert salt.startswith(b"$2b$04$")
+        hashed = bcrypt.hashpw(b"Secret123", salt)
+        assert bcrypt.checkpw(b"Secret123", hashed)
+    
+    def test_salts_are_unique_across_refills(self):
+        """Test that salts never repeat, including across pool refills"""
+        from backend.auth import _next_salt, SALT_POOL_BYTES
+        
+        salts = {_next_salt(12) for _ in range(SALT_POOL_BYTES // 16 * 3)}
+        
+        assert len(salts) == SALT_POOL_BYTES // 16 * 3
@@ -8,7 +8,9 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
 from utils.database import (
     create_user, get_user_by_email, 
     create_book, get_book_by_id,
-    save_summary_with_metadata, get_book_summary_versions
+    save_summary_with_metadata, get_book_summary_versions,
+    get_summaries_by_user, count_summaries_by_user, create_summaries,
+    _oid, _maybe_oid
 )
 
 class TestDatabaseOperations:
@@ -47,6 +49,55 @@ class TestDatabaseOperations:
         assert user["email"] == test_user_data["email"]
         assert user["name"] == test_user_data["name"]
     
+    def test_get_user_by_email_ignores_case(self, test_user_data):
+        """Test that email lookup is case-insensitive"""
+        create_user(
+            name=test_user_data["name"],
+            email=test_user_data["email"],
+            password=test_user_data["password"]
+        )
+        
+        user = get_user_by_email(test_user_data["email"].upper())
+        assert user is not None
+        assert user["email"] == test_user_data["email"]
+    
+    def test_get_user_by_email_with_fields(self, test_user_data):
+        """Test that only the requested fields are returned"""
+        create_user(
+            name=test_user_data["name"],
+            email=test_user_data["email"],
+            password=test_user_data["password"]
+        )
+        
+        user = get_user_by_email(test_user_data["email"], fields=("email", "password_hash"))
+        assert set(user) == {"_id", "email", "password_hash"}
+    
+    def test_lazy_database_caches_resolved_collections(self):
+        """Test that the db proxy resolves each collection only once"""
+        from utils.database import db
+        
+        users = db.users
+        
+        assert db.users is users
+        assert "users" in vars(db)
+    
+    def test_fast_write_collections_are_built_once(self, monkeypatch):
+        """Test that the w:1 view of a collection is reused across writes"""
+        import utils.database as database
+        
+        class Collection:
+            name = "probe"
+            calls = 0
+            
+            def with_options(self, **kwargs):
+                Collection.calls += 1
+                return object()
+        
+        monkeypatch.setattr(database, "_fast_collections", {})
+        
+        assert database._fast_writes(Collection()) is database._fast_writes(Collection())
+        assert Collection.calls == 1
+    
     def test_create_book(self, test_user_data, test_book_data):
         """Test book creation"""
         # First create a user
@@ -112,4 +163,94 @@ class TestDatabaseOperations:
         versions = get_book_summary_versions(book_id, user_id)
         assert len(versions) == 2
         assert versions[0]["version"] == 1
-        assert versions[1]["version"] == 2
\ No newline at end of file
+        assert versions[1]["version"] == 2
+    
+    def test_get_summaries_by_user_paginates(self, test_user_data):
+        """Test that user summaries are returned newest first in pages"""
+        user_id = create_user(
+            name=test_user_data["name"],
+            email=test_user_data["email"],
+            password=test_user_data["password"]
+        )
+        book_id = create_book(user_id=user_id, title="Paged Book", raw_text="Sample book text")
+        for version in range(1, 4):
+            save_summary_with_metadata(
+                book_id=book_id,
+                user_id=user_id,
+                summary_text=f"Summary v{version}",
+                version=version
+            )
+        
+        first_page = get_summaries_by_user(user_id, limit=2)
+        second_page = get_summaries_by_user(user_id, limit=2, skip=2)
+        
+        assert [s["summary_text"] for s in first_page] == ["Summary v3", "Summary v2"]
+        assert [s["summary_text"] for s in second_page] == ["Summary v1"]
+        assert count_summaries_by_user(user_id) == 3
+    
+    def test_create_summaries_bulk(self, test_user_data):
+        """Test inserting several summaries in one call"""
+        user_id = create_user(
+            name=test_user_data["name"],
+            email=test_user_data["email"],
+            password=test_user_data["password"]
+        )
+        book_id = create_book(user_id=user_id, title="Bulk Book", raw_text="Sample book text")
+        
+        summary_ids = create_summaries([
+            {
+                "book_id": book_id,
+                "user_id": user_id,
+                "summary_text": f"Chunk summary {index}",
+                "summary_length": "short",
+                "summary_style": "paragraph",
+                "chunk_summaries": [],
+                "processing_time": 0.5
+            }
+            for index in range(3)
+        ])
+        
+        assert len(summary_ids) == 3
+        assert count_summaries_by_user(user_id) == 3
+        assert create_summaries([]) == []
+    
+    def test_create_summaries_reports_partial_inserts(self, monkeypatch):
+        """Test that a partly failed bulk insert returns the ids it saved"""
+        import utils.database as database
+        from pymongo.errors import BulkWriteError
+        
+        class PartlyFailingCollection:
+            def insert_many(self, documents, ordered=True):
+                for document in documents:
+                    document["_id"] = ObjectId()
+                raise BulkWriteError({"writeErrors": [{"index": 1, "code": 11000}], "nInserted": 2})
+        
+        monkeypatch.setattr(database, "_fast_writes", lambda collection: PartlyFailingCollection())
+        documents = [
+            {
+                "book_id": ObjectId(),
+                "user_id": ObjectId(),
+                "summary_text": f"Chunk summary {index}",
+                "summary_length": "short",
+                "summary_style": "paragraph",
+                "chunk_summaries": [],
+                "processing_time": 0.5
+            }
+            for index in range(3)
+        ]
+        
+        assert len(create_summaries(documents)) == 2
+    
+    def test_object_ids_are_parsed_once_and_reused(self):
+        """Test that id strings map to one shared ObjectId and others pass through"""
+        raw_id = str(ObjectId())
+        
+        assert _oid(raw_id) == ObjectId(raw_id)
+        assert _oid(raw_id) is _oid(raw_id)
+        assert _maybe_oid(raw_id) is _oid(raw_id)
+        
+        existing = ObjectId()
+        assert _oid(existing) is existing
+        assert _maybe_oid("not-an-object-id") == "not-an-object-id"
+        with pytest.raises(Exception):
+            _oid("not-an-object-id")
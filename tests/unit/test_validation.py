@@ -0,0 +1,102 @@
+import pytest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from utils.validation import (
+    is_valid_email, is_valid_name, is_valid_password,
+    validate_registration, _classify_password, _match_email
+)
+
+class TestValidation:
+    
+    @pytest.mark.parametrize("email", [
+        "user@example.com",
+        "First.Last+tag@mail.example.org",
+        "  padded@example.io  ",
+    ])
+    def test_valid_emails(self, email):
+        """Test that well-formed emails are accepted"""
+        assert is_valid_email(email)
+    
+    @pytest.mark.parametrize("email", [
+        "",
+        None,
+        "no-at-sign.com",
+        "user@domain",
+        "user@domain.c",
+        "user@@example.com",
+        "user@example.c0m",
+    ])
+    def test_invalid_emails(self, email):
+        """Test that malformed emails are rejected"""
+        assert not is_valid_email(email)
+    
+    def test_email_matcher_agrees_with_reference_regex(self):
+        """Test the linear matcher against the pattern it replaces"""
+        import random
+        import re
+        reference = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+        rng = random.Random(0)
+        alphabet = "aZ9._%+-@!"
+        
+        for _ in range(20000):
+            email = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+            assert _match_email(email) == (reference.match(email) is not None), email
+    
+    def test_name_validation(self):
+        """Test name format rules"""
+        assert is_valid_name("Mary-Jane O'Neil")
+        assert not is_valid_name("A")
+        assert not is_valid_name("R2D2")
+    
+    def test_password_validation(self):
+        """Test password strength rules"""
+        assert is_valid_password("Secret123") == (True, "Password is valid")
+        assert not is_valid_password("Sh0rt")[0]
+        assert not is_valid_password("lowercase123")[0]
+        assert not is_valid_password("NoDigitsHere")[0]
+    
+    def test_oversized_inputs_rejected(self):
+        """Test that inputs over the size limits are rejected outright"""
+        assert not is_valid_email("a" * 250 + "@example.com")
+        assert not is_valid_name("A" * 129)
+        assert is_valid_password("Aa1" * 400) == (False, "Password must be at most 1024 characters")
+    
+    def test_password_classes_found_in_one_pass(self):
+        """Test that upper/digit detection works regardless of position"""
+        assert _classify_password("abcdefgH1") == (True, True)
+        assert _classify_password("1abcdefgh") == (False, True)
+        assert _classify_password("") == (False, False)
+    
+    def test_password_classes_non_ascii(self):
+        """Test that non-ASCII upper-case letters and digits still count"""
+        assert _classify_password("écoleÉ٣") == (True, True)
+        assert _classify_password("école12") == (False, True)
+    
+    def test_validate_registration_valid(self):
+        """Test that a good registration has no errors"""
+        assert validate_registration("Jane Doe", "jane@example.com", "Secret123", "Secret123") == []
+    
+    def test_validate_registration_collects_errors(self):
+        """Test that every failing rule is reported"""
+        errors = validate_registration("J", "not-an-email", "weak", "other")
+        
+        assert errors == [
+            "Invalid email format",
+            "Name must be at least 2 characters",
+            "Password must be at least 8 characters",
+            "Passwords do not match",
+        ]
+    
+    def test_validate_registration_rejects_oversized_first(self):
+        """Test that oversized input short-circuits the format checks"""
+        errors = validate_registration("Jane", "jane@example.com", "A1" * 600)
+        
+        assert errors == ["Password is too long (max 1024 characters)"]
+    
+    def test_validate_registration_handles_missing_fields(self):
+        """Test that None inputs are reported instead of raising"""
+        errors = validate_registration("Jane Doe", None, "Secret123")
+        
+        assert errors == ["Invalid email format"]
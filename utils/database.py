@@ -1,13 +1,17 @@
 # utils/database.py
 import os
-import re
 import sys
 import bcrypt
+import threading
 import builtins
+from functools import lru_cache
 from bson import ObjectId
-from pymongo import MongoClient, ASCENDING, DESCENDING
+from bson.errors import InvalidId
+from pymongo import MongoClient, ASCENDING, DESCENDING, WriteConcern
+from pymongo.errors import BulkWriteError
 from datetime import datetime
 from dotenv import load_dotenv
+from utils.validation import is_valid_email
 import logging
 
 
@@ -48,6 +52,9 @@ load_dotenv()
 
 MONGO_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
 DB_NAME = os.getenv("DB_NAME", "book_summarization")
+# Case-insensitive comparison for user emails; queries must pass the same
+# collation as the users.email index for MongoDB to use it.
+EMAIL_COLLATION = {"locale": "en", "strength": 2}
 RUNNING_TESTS = (
     "pytest" in sys.modules
     or os.getenv("PYTEST_CURRENT_TEST") is not None
@@ -57,57 +64,51 @@ RUNNING_TESTS = (
 print(f"🔗 MongoDB URI: {MONGO_URI}")
 print(f"📁 Database: {DB_NAME}")
 
-# Initialize db variable
-db = None
-
-try:
-    if RUNNING_TESTS:
-        raise RuntimeError("Skipping live MongoDB connection during pytest execution")
-    if MONGO_URI and MONGO_URI != "mongodb://localhost:27017":
-        client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
-        # Test connection
-        client.server_info()
-        db = client[DB_NAME]
-        print("✅ MongoDB connected successfully")
-    else:
-        print("⚠️ Using local MongoDB or fallback mode")
-        # Try local connection
-        client = MongoClient("mongodb://localhost:27017", serverSelectionTimeoutMS=3000)
-        client.server_info()
-        db = client[DB_NAME]
-        print("✅ Local MongoDB connected successfully")
-except Exception as e:
-    print(f"❌ MongoDB connection failed: {e}")
-    print("⚠️ Running in simulation mode (no database)")
-    # Fallback to simulation mode
-    class MockDB:
-        def __init__(self):
-            self.collections = {}
-            self.mock_data = {
-                'users': [],
-                'books': [],
-                'summaries': [],
-                'progress': [],
-                'errors': [],
-                'summary_actions': []
-            }
-        
-        def list_collection_names(self):
-            return list(self.mock_data.keys())
-        
-        def create_collection(self, name):
-            if name not in self.mock_data:
-                self.mock_data[name] = []
-        
-        def __getitem__(self, name):
-            if name not in self.collections:
-                self.collections[name] = MockCollection(name, self.mock_data)
-            return self.collections[name]
+# Connection pool settings for the shared client
+MONGO_CLIENT_OPTIONS = {
+    "maxPoolSize": int(os.getenv("MONGO_MAX_POOL_SIZE", "50")),
+    "minPoolSize": int(os.getenv("MONGO_MIN_POOL_SIZE", "5")),
+    "serverSelectionTimeoutMS": 5000,
+    "connectTimeoutMS": 5000,
+    "socketTimeoutMS": 20000,
+    "retryWrites": True,
+}
+
+# Book and summary documents can be regenerated from the upload, so their
+# writes only wait for the primary. User writes are left on the deployment's
+# default write concern, which depends on the server: usually w: majority on
+# MongoDB 5.0+ replica sets, but w: 1 on older servers, standalones and some
+# arbiter setups.
+FAST_WRITE_CONCERN = WriteConcern(w=1)
+
+class MockDB:
+    def __init__(self):
+        self.collections = {}
+        self.mock_data = {
+            'users': [],
+            'books': [],
+            'summaries': [],
+            'progress': [],
+            'errors': [],
+            'summary_actions': []
+        }
+    
+    def list_collection_names(self):
+        return list(self.mock_data.keys())
+    
+    def create_collection(self, name):
+        if name not in self.mock_data:
+            self.mock_data[name] = []
+    
+    def __getitem__(self, name):
+        if name not in self.collections:
+            self.collections[name] = MockCollection(name, self.mock_data)
+        return self.collections[name]
 
-        def __getattr__(self, name):
-            if name.startswith("__"):
-                raise AttributeError(name)
-            return self.__getitem__(name)
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return self.__getitem__(name)
 
 class MockCollection:
     def __init__(self, name, mock_data):
@@ -116,10 +117,11 @@ class MockCollection:
         if name not in self.mock_data:
             self.mock_data[name] = []
 
-    def _matches(self, document, query=None):
+    def _matches(self, document, query=None, collation=None):
         if not query:
             return True
 
+        ignore_case = bool(collation) and collation.get("strength", 3) <= 2
         for key, value in query.items():
             doc_value = document.get(key)
             if isinstance(value, dict):
@@ -127,6 +129,9 @@ class MockCollection:
                     return False
                 if "$gte" in value and (doc_value is None or doc_value < value["$gte"]):
                     return False
+            elif ignore_case and isinstance(value, str) and isinstance(doc_value, str):
+                if doc_value.casefold() != value.casefold():
+                    return False
             elif doc_value != value:
                 return False
         return True
@@ -152,7 +157,8 @@ class MockCollection:
         return type('Result', (), {'inserted_id': document['_id']})()
     
     def find_one(self, query=None, *args, **kwargs):
-        results = [document for document in self.mock_data[self.name] if self._matches(document, query)]
+        collation = kwargs.get("collation")
+        results = [document for document in self.mock_data[self.name] if self._matches(document, query, collation)]
 
         sort_spec = kwargs.get("sort")
         if sort_spec and results:
@@ -160,12 +166,21 @@ class MockCollection:
                 reverse = direction == -1
                 results.sort(key=lambda doc: doc.get(sort_key), reverse=reverse)
 
-        if results:
-            return results[0]
-        return None
+        if not results:
+            return None
+
+        projection = kwargs.get("projection")
+        if projection:
+            return {
+                key: value for key, value in results[0].items()
+                if key == "_id" or projection.get(key)
+            }
+        return results[0]
     
     def find(self, query=None):
-        results = [document for document in self.mock_data[self.name] if self._matches(document, query)]
+        # Hand out copies like a real cursor so callers that stringify ids
+        # don't corrupt the stored documents.
+        results = [dict(document) for document in self.mock_data[self.name] if self._matches(document, query)]
         return MockCursor(results)
     
     def update_one(self, filter, update, **kwargs):
@@ -210,6 +225,16 @@ class MockCollection:
         deleted_count = original_count - len(self.mock_data[self.name])
         return type('Result', (), {'deleted_count': deleted_count})()
     
+    def with_options(self, **kwargs):
+        return self
+
+    def insert_many(self, documents, ordered=True):
+        inserted_ids = [self.insert_one(document).inserted_id for document in documents]
+        return type('Result', (), {'inserted_ids': inserted_ids})()
+
+    def create_index(self, keys, **kwargs):
+        return kwargs.get("name", "_".join(f"{key}_{direction}" for key, direction in keys))
+    
     def count_documents(self, filter):
         return len([document for document in self.mock_data[self.name] if self._matches(document, filter)])
 
@@ -329,19 +354,62 @@ class MockCursor:
         self._index += 1
         return item
 
-# Create mock database if real connection failed
-if db is None:
-    db = MockDB()
-    print("✅ Mock database created for testing")
+_database = None
+_database_lock = threading.Lock()
+
+def _open_database():
+    """Connect to MongoDB, falling back to the in-memory mock database"""
+    try:
+        if RUNNING_TESTS:
+            raise RuntimeError("Skipping live MongoDB connection during pytest execution")
+        client = MongoClient(MONGO_URI, **MONGO_CLIENT_OPTIONS)
+        # Test connection
+        client.server_info()
+        database = client[DB_NAME]
+        print("✅ MongoDB connected successfully")
+    except Exception as e:
+        print(f"❌ MongoDB connection failed: {e}")
+        print("⚠️ Running in simulation mode (no database)")
+        database = MockDB()
+        print("✅ Mock database created for testing")
+
+    print("🔧 Initializing database collections...")
+    try:
+        collections_needed = ['users', 'books', 'summaries', 'progress', 'errors', 'summary_actions']
+        existing = database.list_collection_names()
+        for collection in collections_needed:
+            if collection not in existing:
+                database.create_collection(collection)
+                print(f"  ✅ Created collection: {collection}")
+    except Exception as e:
+        print(f"⚠️ Could not initialize collections: {e}")
+    return database
 
 def connect_db():
-    """Get database connection"""
-    return db
+    """Get database connection, connecting on first use"""
+    global _database
+    if _database is None:
+        with _database_lock:
+            if _database is None:
+                _database = _open_database()
+    return _database
+
+class _LazyDatabase:
+    """Stand-in for the module-level db that defers connecting until first use"""
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        value = getattr(connect_db(), name)
+        # __getattr__ only runs on a miss, so storing the resolved collection
+        # makes every later db.<name> a plain attribute lookup
+        setattr(self, name, value)
+        return value
+
+    def __getitem__(self, name):
+        return connect_db()[name]
 
-def is_valid_email(email):
-    """Validate email format"""
-    email = (email or "").strip().lower()
-    return bool(re.match(r"[^@]+@[^@]+\.[^@]+", email))
+# Importing this module no longer blocks on DNS/TLS; the first query connects.
+db = _LazyDatabase()
 
 def create_user(name, email, password, role="user"):
     """Create a new user"""
@@ -371,10 +439,11 @@ def create_user(name, email, password, role="user"):
         # For testing without DB
         return "mock_user_id"
 
-def get_user_by_email(email):
-    """Get user by email"""
+def get_user_by_email(email, fields=None):
+    """Get user by email (case-insensitive), optionally fetching only `fields`"""
     try:
-        user = db.users.find_one({"email": email.lower()})
+        projection = dict.fromkeys(fields, 1) if fields else None
+        user = db.users.find_one({"email": email}, projection=projection, collation=EMAIL_COLLATION)
         if user:
             user['_id'] = str(user.get('_id', ''))
         return user
@@ -382,11 +451,56 @@ def get_user_by_email(email):
         print(f"❌ Error getting user by email {email}: {e}")
         return None
 
+# Collection name -> that collection with FAST_WRITE_CONCERN, built on first
+# write so each later write reuses it instead of a fresh with_options() copy
+_fast_collections = {}
+
+def _fast_writes(collection):
+    """Return collection with FAST_WRITE_CONCERN applied"""
+    fast = _fast_collections.get(collection.name)
+    if fast is None:
+        fast = _fast_collections[collection.name] = collection.with_options(
+            write_concern=FAST_WRITE_CONCERN
+        )
+    return fast
+
+@lru_cache(maxsize=4096)
+def _parse_oid(value):
+    # ObjectId is immutable, so one parsed instance can be shared by every
+    # caller handling the same id within a request flow
+    return ObjectId(value)
+
+def _oid(value):
+    """Return value as an ObjectId, parsing hex strings once; raises on invalid strings"""
+    return _parse_oid(value) if isinstance(value, str) else value
+
+def _maybe_oid(value):
+    """Like _oid, but hand back strings that are not valid ObjectIds unchanged"""
+    if not isinstance(value, str):
+        return value
+    try:
+        return _parse_oid(value)
+    except InvalidId:
+        return value
+
+def create_indexes():
+    """Create the indexes used by the auth and library queries"""
+    db.users.create_index(
+        [("email", ASCENDING)],
+        unique=True,
+        collation=EMAIL_COLLATION,
+        name="email_ci_unique"
+    )
+    db.books.create_index([("user_id", ASCENDING)])
+    # Backs get_summaries_by_user's filter + newest-first sort
+    db.summaries.create_index([("user_id", ASCENDING), ("created_at", DESCENDING)])
+    print("✅ Database indexes created")
+
 def create_book(user_id, title, author="", chapter="", file_path="", raw_text=""):
     """Create a new book entry in database"""
     try:
         book_data = {
-            "user_id": ObjectId(user_id) if isinstance(user_id, str) and ObjectId.is_valid(user_id) else user_id,
+            "user_id": _maybe_oid(user_id),
             "title": title,
             "author": author,
             "chapter": chapter,
@@ -399,7 +513,7 @@ def create_book(user_id, title, author="", chapter="", file_path="", raw_text=""
             "progress": 0,
             "progress_message": "Uploaded"
         }
-        result = db.books.insert_one(book_data)
+        result = _fast_writes(db.books).insert_one(book_data)
         book_id = result.inserted_id
         print(f"✅ Book created: {title} (ID: {book_id})")
         return book_id
@@ -411,8 +525,8 @@ def create_book(user_id, title, author="", chapter="", file_path="", raw_text=""
 def update_book_status(book_id, status):
     """Update book workflow status."""
     try:
-        db.books.update_one(
-            {"_id": ObjectId(book_id) if isinstance(book_id, str) else book_id},
+        _fast_writes(db.books).update_one(
+            {"_id": _oid(book_id)},
             {"$set": {"status": status}}
         )
         print(f"✅ Book {book_id} status updated to: {status}")
@@ -424,8 +538,8 @@ def update_book_status(book_id, status):
 def update_book_text(book_id, raw_text, word_count, char_count, status="text_extracted"):
     """Stores extracted text + word count + char count."""
     try:
-        db.books.update_one(
-            {"_id": ObjectId(book_id) if isinstance(book_id, str) else book_id},
+        _fast_writes(db.books).update_one(
+            {"_id": _oid(book_id)},
             {
                 "$set": {
                     "raw_text": raw_text,
@@ -442,25 +556,32 @@ def update_book_text(book_id, raw_text, word_count, char_count, status="text_ext
         print(f"❌ Error updating book text for {book_id}: {e}")
         return False
 
+def _build_summary_document(book_id, user_id, summary_text, summary_length, summary_style,
+                            chunk_summaries, processing_time):
+    return {
+        "book_id": _maybe_oid(book_id),
+        "user_id": _maybe_oid(user_id),
+        "summary_text": summary_text,
+        "summary_length": summary_length,
+        "summary_style": summary_style,
+        "chunk_summaries": chunk_summaries,
+        "processing_time": float(processing_time),
+        "created_at": datetime.utcnow(),
+        "version": 1,
+        "is_active": True,
+        "is_favorite": False,
+        "tags": []
+    }
+
 def create_summary(book_id, user_id, summary_text, summary_length, summary_style,
                    chunk_summaries, processing_time):
     """Create summary (legacy function)"""
     try:
-        summary = {
-            "book_id": ObjectId(book_id) if isinstance(book_id, str) and ObjectId.is_valid(book_id) else book_id,
-            "user_id": ObjectId(user_id) if isinstance(user_id, str) and ObjectId.is_valid(user_id) else user_id,
-            "summary_text": summary_text,
-            "summary_length": summary_length,
-            "summary_style": summary_style,
-            "chunk_summaries": chunk_summaries,
-            "processing_time": float(processing_time),
-            "created_at": datetime.utcnow(),
-            "version": 1,
-            "is_active": True,
-            "is_favorite": False,
-            "tags": []
-        }
-        result = db.summaries.insert_one(summary)
+        summary = _build_summary_document(
+            book_id, user_id, summary_text, summary_length, summary_style,
+            chunk_summaries, processing_time
+        )
+        result = _fast_writes(db.summaries).insert_one(summary)
         summary_id = str(result.inserted_id)
         print(f"✅ Summary created: v1 for book {book_id} (ID: {summary_id})")
         return summary_id
@@ -468,11 +589,44 @@ def create_summary(book_id, user_id, summary_text, summary_length, summary_style
         print(f"❌ Error creating summary for book {book_id}: {e}")
         return "mock_summary_id"
 
-def get_summaries_by_user(user_id):
-    """Get all summaries for a user"""
+def create_summaries(summaries):
+    """
+    Create several summaries in one round-trip.
+    Each item holds create_summary's keyword arguments; returns the new ids.
+    """
+    if not summaries:
+        return []
     try:
-        user_obj_id = ObjectId(user_id) if isinstance(user_id, str) and ObjectId.is_valid(user_id) else user_id
-        summaries = list(db.summaries.find({"user_id": user_obj_id}).sort("created_at", -1))
+        documents = [_build_summary_document(**summary) for summary in summaries]
+        result = _fast_writes(db.summaries).insert_many(documents, ordered=False)
+        summary_ids = [str(inserted_id) for inserted_id in result.inserted_ids]
+        print(f"✅ Created {len(summary_ids)} summaries")
+        return summary_ids
+    except BulkWriteError as e:
+        # Unordered inserts carry on past a failed document, so the rest are
+        # saved; report them (insert_many set each document's _id) so callers
+        # do not retry and duplicate them
+        failed = {error["index"] for error in e.details.get("writeErrors", [])}
+        summary_ids = [
+            str(document["_id"]) for index, document in enumerate(documents)
+            if index not in failed
+        ]
+        print(f"❌ Created {len(summary_ids)} of {len(summaries)} summaries: {e}")
+        return summary_ids
+    except Exception as e:
+        print(f"❌ Error creating {len(summaries)} summaries: {e}")
+        return []
+
+def get_summaries_by_user(user_id, limit=50, skip=0):
+    """Get a page of a user's summaries, newest first"""
+    try:
+        user_obj_id = _maybe_oid(user_id)
+        summaries = list(
+            db.summaries.find({"user_id": user_obj_id})
+            .sort("created_at", -1)
+            .skip(skip)
+            .limit(limit)
+        )
         
         # Convert ObjectId to string
         for summary in summaries:
@@ -486,10 +640,19 @@ def get_summaries_by_user(user_id):
         print(f"❌ Error getting user summaries for {user_id}: {e}")
         return []
 
+def count_summaries_by_user(user_id):
+    """Count a user's summaries without loading them"""
+    try:
+        user_obj_id = _maybe_oid(user_id)
+        return db.summaries.count_documents({"user_id": user_obj_id})
+    except Exception as e:
+        print(f"❌ Error counting user summaries for {user_id}: {e}")
+        return 0
+
 def delete_book(book_id):
     """Delete book and its summaries from the database."""
     try:
-        book_obj_id = ObjectId(book_id) if isinstance(book_id, str) else book_id
+        book_obj_id = _oid(book_id)
         db.books.delete_one({"_id": book_obj_id})
         db.summaries.delete_many({"book_id": book_obj_id})
         print(f"✅ Book {book_id} deleted")
@@ -501,7 +664,7 @@ def delete_book(book_id):
 def get_book_by_id(book_id):
     """Get book by ID"""
     try:
-        book_obj_id = ObjectId(book_id) if isinstance(book_id, str) else book_id
+        book_obj_id = _oid(book_id)
         book = db.books.find_one({"_id": book_obj_id})
         if book:
             book['_id'] = str(book.get('_id', ''))
@@ -515,13 +678,13 @@ def get_book_by_id(book_id):
 def update_progress(book_id, message, percentage):
     """Update processing progress"""
     try:
-        book_obj_id = ObjectId(book_id) if isinstance(book_id, str) else book_id
+        book_obj_id = _oid(book_id)
         
         # Create progress collection if not exists
         if 'progress' not in db.list_collection_names():
             db.create_collection('progress')
         
-        db.progress.update_one(
+        _fast_writes(db.progress).update_one(
             {"book_id": book_obj_id},
             {
                 "$set": {
@@ -533,7 +696,7 @@ def update_progress(book_id, message, percentage):
             upsert=True
         )
         
-        db.books.update_one(
+        _fast_writes(db.books).update_one(
             {"_id": book_obj_id},
             {
                 "$set": {
@@ -552,7 +715,7 @@ def update_progress(book_id, message, percentage):
 def get_progress(book_id):
     """Get progress for a book"""
     try:
-        book_obj_id = ObjectId(book_id) if isinstance(book_id, str) else book_id
+        book_obj_id = _oid(book_id)
         progress = db.progress.find_one({"book_id": book_obj_id})
         if progress:
             progress['_id'] = str(progress.get('_id', ''))
@@ -606,8 +769,8 @@ def save_summary_with_metadata(
             db.create_collection('summary_actions')
         
         # Convert IDs
-        book_obj_id = ObjectId(book_id) if isinstance(book_id, str) and ObjectId.is_valid(book_id) else book_id
-        user_obj_id = ObjectId(user_id) if isinstance(user_id, str) and ObjectId.is_valid(user_id) else user_id
+        book_obj_id = _maybe_oid(book_id)
+        user_obj_id = _maybe_oid(user_id)
         
         # Find existing summaries for this book/user
         existing_summaries = list(db.summaries.find({
@@ -654,7 +817,7 @@ def save_summary_with_metadata(
             "deleted_at": None
         }
         
-        result = db.summaries.insert_one(summary_doc)
+        result = _fast_writes(db.summaries).insert_one(summary_doc)
         summary_id = str(result.inserted_id)
         
         # Log the action
@@ -683,15 +846,9 @@ def get_book_summary_versions(book_id, user_id):
     """
     try:
         # Normalize IDs
-        if isinstance(book_id, str) and ObjectId.is_valid(book_id):
-            book_obj_id = ObjectId(book_id)
-        else:
-            book_obj_id = book_id
+        book_obj_id = _maybe_oid(book_id)
         
-        if isinstance(user_id, str) and ObjectId.is_valid(user_id):
-            user_obj_id = ObjectId(user_id)
-        else:
-            user_obj_id = user_id
+        user_obj_id = _maybe_oid(user_id)
 
         # Query summaries
         summaries = list(db.summaries.find({
@@ -735,8 +892,8 @@ def set_active_summary_version(book_id, user_id, version):
     Set a specific version as the active summary for a book
     """
     try:
-        book_obj_id = ObjectId(book_id) if isinstance(book_id, str) else book_id
-        user_obj_id = ObjectId(user_id) if isinstance(user_id, str) else user_id
+        book_obj_id = _oid(book_id)
+        user_obj_id = _oid(user_id)
         
         # First deactivate all versions for this book/user
         db.summaries.update_many(
@@ -787,8 +944,8 @@ def update_summary_metadata(summary_id, user_id, updates):
     Update summary metadata (not the summary text itself)
     """
     try:
-        summary_obj_id = ObjectId(summary_id) if isinstance(summary_id, str) else summary_id
-        user_obj_id = ObjectId(user_id) if isinstance(user_id, str) else user_id
+        summary_obj_id = _oid(summary_id)
+        user_obj_id = _oid(user_id)
         
         # Only allow updating certain fields
         allowed_updates = {
@@ -842,8 +999,8 @@ def delete_summary(summary_id, user_id, permanent=False):
     Delete a summary (soft delete by default)
     """
     try:
-        summary_obj_id = ObjectId(summary_id) if isinstance(summary_id, str) else summary_id
-        user_obj_id = ObjectId(user_id) if isinstance(user_id, str) else user_id
+        summary_obj_id = _oid(summary_id)
+        user_obj_id = _oid(user_id)
         
         if permanent:
             # Permanent delete
@@ -900,8 +1057,8 @@ def restore_summary(summary_id, user_id):
     Restore a soft-deleted summary
     """
     try:
-        summary_obj_id = ObjectId(summary_id) if isinstance(summary_id, str) else summary_id
-        user_obj_id = ObjectId(user_id) if isinstance(user_id, str) else user_id
+        summary_obj_id = _oid(summary_id)
+        user_obj_id = _oid(user_id)
         
         result = db.summaries.update_one(
             {
@@ -942,9 +1099,10 @@ def log_summary_action(summary_id, user_id, action, metadata=None):
         if 'summary_actions' not in db.list_collection_names():
             db.create_collection('summary_actions')
         
+        summary_obj_id = _maybe_oid(summary_id)
         log_entry = {
-            "summary_id": ObjectId(summary_id) if summary_id and isinstance(summary_id, str) and ObjectId.is_valid(summary_id) else None,
-            "user_id": ObjectId(user_id) if isinstance(user_id, str) and ObjectId.is_valid(user_id) else user_id,
+            "summary_id": summary_obj_id if isinstance(summary_obj_id, ObjectId) else None,
+            "user_id": _maybe_oid(user_id),
             "action": action,
             "metadata": metadata or {},
             "timestamp": datetime.utcnow()
@@ -963,10 +1121,7 @@ def get_summary_by_id(summary_id, include_book_info=False):
     Get summary by ID with optional book information
     """
     try:
-        if isinstance(summary_id, str) and ObjectId.is_valid(summary_id):
-            summary_obj_id = ObjectId(summary_id)
-        else:
-            summary_obj_id = summary_id
+        summary_obj_id = _maybe_oid(summary_id)
         
         summary = db.summaries.find_one({"_id": summary_obj_id})
         
@@ -1000,10 +1155,7 @@ def get_books_by_user(user_id, limit=100):
     Get all books for a specific user
     """
     try:
-        if isinstance(user_id, str) and ObjectId.is_valid(user_id):
-            user_obj_id = ObjectId(user_id)
-        else:
-            user_obj_id = user_id
+        user_obj_id = _maybe_oid(user_id)
         
         books = list(db.books.find(
             {"user_id": user_obj_id}
@@ -1122,10 +1274,6 @@ def get_recent_activities(limit=50):
 # NEW FUNCTIONS FOR APP.PY
 # ================================
 
-def connect_db():
-    """Get database connection"""
-    return db
-
 def get_db():
     """
     Compatibility function for Flask apps that expect get_db().
@@ -1133,10 +1281,6 @@ def get_db():
     """
     return connect_db()
 
-def is_valid_email(email):
-    """Validate email format"""
-    return bool(re.match(r"[^@]+@[^@]+\.[^@]+", email))
-
 def verify_password(stored_hash, password):
     """Verify password against stored hash"""
     try:
@@ -1148,7 +1292,7 @@ def verify_password(stored_hash, password):
 def update_user_last_login(user_id):
     """Update user's last login timestamp"""
     try:
-        user_obj_id = ObjectId(user_id) if isinstance(user_id, str) and ObjectId.is_valid(user_id) else user_id
+        user_obj_id = _maybe_oid(user_id)
         db.users.update_one(
             {"_id": user_obj_id},
             {"$set": {"last_login": datetime.utcnow()}}
@@ -1164,8 +1308,7 @@ def delete_book_and_summary(book_id):
     Delete a book and all its summaries safely
     """
     try:
-        if isinstance(book_id, str):
-            book_id = ObjectId(book_id)
+        book_id = _oid(book_id)
 
         # Delete summaries first
         db.summaries.delete_many({"book_id": book_id})
@@ -1182,7 +1325,7 @@ def delete_book_and_summary(book_id):
 def get_user_by_id(user_id):
     """Get user by ID"""
     try:
-        user_obj_id = ObjectId(user_id) if isinstance(user_id, str) and ObjectId.is_valid(user_id) else user_id
+        user_obj_id = _maybe_oid(user_id)
         user = db.users.find_one({"_id": user_obj_id})
         if user:
             user['_id'] = str(user.get('_id', ''))
@@ -1191,15 +1334,4 @@ def get_user_by_id(user_id):
         print(f"❌ Error getting user by ID {user_id}: {e}")
         return None
 
-# Initialize database collections on import
-print("🔧 Initializing database collections...")
-try:
-    collections_needed = ['users', 'books', 'summaries', 'progress', 'errors', 'summary_actions']
-    for collection in collections_needed:
-        if collection not in db.list_collection_names():
-            db.create_collection(collection)
-            print(f"  ✅ Created collection: {collection}")
-except Exception as e:
-    print(f"⚠️ Could not initialize collections: {e}")
-
 print("🎉 Database module loaded successfully!")
@@ -6,8 +6,10 @@ import traceback
 from datetime import datetime
 from functools import wraps
 import time
+from collections import deque
 from typing import Optional, Dict, Any
 import hashlib
+import threading
 
 # Configure logging
 logging.basicConfig(
@@ -174,46 +176,67 @@ class ErrorLogger:
             pass
 
 class RateLimiter:
-    """Simple rate limiter"""
+    """Simple thread-safe rate limiter"""
+    
+    SWEEP_INTERVAL = 600  # seconds between purges of idle users
     
     def __init__(self, max_requests: int, time_window: int):
         self.max_requests = max_requests
         self.time_window = time_window  # in seconds
-        self.requests = {}  # user_id -> list of timestamps
+        self.requests = {}  # user_id -> deque of the last max_requests timestamps
+        self._last_sweep = time.time()
+        # Streamlit serves each session on its own thread; without the lock two
+        # concurrent attempts can both pass the check before either is recorded.
+        self._lock = threading.Lock()
     
     def is_allowed(self, user_id: str) -> bool:
         """Check if request is allowed"""
         now = time.time()
-        
-        if user_id not in self.requests:
-            self.requests[user_id] = []
-        
-        # Clean old requests
-        self.requests[user_id] = [
-            ts for ts in self.requests[user_id]
-            if now - ts < self.time_window
-        ]
-        
-        if len(self.requests[user_id]) >= self.max_requests:
-            return False
-        
-        self.requests[user_id].append(now)
-        return True
+        with self._lock:
+            self._sweep(now)
+            
+            history = self.requests.get(user_id)
+            if history is None:
+                history = self.requests[user_id] = deque(maxlen=self.max_requests)
+            
+            # The deque only holds the newest max_requests timestamps, so the
+            # limit is hit exactly when it is full and its oldest entry is still
+            # inside the window.
+            if len(history) == self.max_requests and now - history[0] < self.time_window:
+                return False
+            
+            history.append(now)
+            return True
     
     def get_retry_after(self, user_id: str) -> int:
         """Get seconds until next allowed request"""
-        if user_id not in self.requests or not self.requests[user_id]:
-            return 0
+        with self._lock:
+            history = self.requests.get(user_id)
+            if not history:
+                return 0
+            oldest_request = history[0]
         
-        oldest_request = min(self.requests[user_id])
         return max(0, self.time_window - (time.time() - oldest_request))
 
     def reset(self, user_id: Optional[str] = None):
         """Clear rate-limit history for one user or all users."""
-        if user_id is None:
-            self.requests.clear()
+        with self._lock:
+            if user_id is None:
+                self.requests.clear()
+                return
+            self.requests.pop(user_id, None)
+    
+    def _sweep(self, now: float):
+        """Drop users whose newest request has left the window (caller holds the lock)"""
+        if now - self._last_sweep < self.SWEEP_INTERVAL:
             return
-        self.requests.pop(user_id, None)
+        self._last_sweep = now
+        stale = [
+            user_id for user_id, history in self.requests.items()
+            if not history or now - history[-1] >= self.time_window
+        ]
+        for user_id in stale:
+            del self.requests[user_id]
 
 # Global rate limiter instances
 upload_limiter = RateLimiter(max_requests=10, time_window=300)  # 10 uploads per 5 minutes
@@ -0,0 +1,128 @@
+# utils/validation.py
+"""Registration and login input validation shared by the backend and frontend."""
+import re
+import string
+
+# Input size limits, checked before any regex or hashing work
+MAX_EMAIL_LENGTH = 254
+MAX_NAME_LENGTH = 128
+MIN_PASSWORD_LENGTH = 8
+MAX_PASSWORD_LENGTH = 1024
+
+# Validation patterns
+NAME_REGEX = re.compile(r'^[A-Za-z\s\-\']+$')
+
+
+# Character classes for is_valid_email
+_EMAIL_LOCAL_CHARS = frozenset(string.ascii_letters + string.digits + "._%+-")
+_EMAIL_DOMAIN_CHARS = frozenset(string.ascii_letters + string.digits + ".-")
+_EMAIL_TLD_CHARS = frozenset(string.ascii_letters)
+
+
+def _match_email(email):
+    r"""
+    Linear-time equivalent of ^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$.
+    Only the last '.' can start the TLD (the TLD may not contain dots), so
+    the address splits deterministically into local@head.tld and each part
+    is checked against its character class once. No backtracking engine is
+    involved.
+    """
+    local, _, domain = email.partition("@")
+    if not local or not _EMAIL_LOCAL_CHARS.issuperset(local):
+        return False
+    head, _, tld = domain.rpartition(".")
+    return (
+        bool(head)
+        and len(tld) >= 2
+        and _EMAIL_DOMAIN_CHARS.issuperset(head)
+        and _EMAIL_TLD_CHARS.issuperset(tld)
+    )
+
+
+def is_valid_email(email):
+    """Validate email format"""
+    if not email or len(email) > MAX_EMAIL_LENGTH:
+        return False
+    return _match_email(email.strip().lower())
+
+
+def is_valid_name(name):
+    """Validate name format"""
+    if not name or len(name) > MAX_NAME_LENGTH or len(name.strip()) < 2:
+        return False
+    return NAME_REGEX.match(name.strip()) is not None
+
+
+# Byte -> character class, so ASCII passwords are classified by one
+# bytes.translate call and two memchr-style membership tests in C.
+_UPPER = 1
+_DIGIT = 2
+_CLASS_TABLE = bytes(
+    _UPPER if 65 <= b <= 90 else _DIGIT if 48 <= b <= 57 else 0
+    for b in range(256)
+)
+
+
+def _classify_password(password):
+    """Scan the password once and report (has_upper, has_digit)"""
+    if password.isascii():
+        classes = password.encode('ascii').translate(_CLASS_TABLE)
+        return _UPPER in classes, _DIGIT in classes
+
+    # Non-ASCII passwords keep str.isupper/isdigit's Unicode semantics
+    has_upper = has_digit = False
+    for ch in password:
+        if ch.isupper():
+            has_upper = True
+        elif ch.isdigit():
+            has_digit = True
+        else:
+            continue
+        if has_upper and has_digit:
+            break
+    return has_upper, has_digit
+
+
+def is_valid_password(password):
+    """Validate password strength"""
+    if len(password) < MIN_PASSWORD_LENGTH:
+        return False, f"Password must be at least {MIN_PASSWORD_LENGTH} characters"
+    if len(password) > MAX_PASSWORD_LENGTH:
+        return False, f"Password must be at most {MAX_PASSWORD_LENGTH} characters"
+    has_upper, has_digit = _classify_password(password)
+    if not has_upper:
+        return False, "Password must contain at least one uppercase letter"
+    if not has_digit:
+        return False, "Password must contain at least one number"
+    return True, "Password is valid"
+
+
+def validate_registration(name, email, password, confirm=None):
+    """Validate registration inputs and return a list of error messages"""
+    name, email, password = name or "", email or "", password or ""
+    errors = []
+    if len(email) > MAX_EMAIL_LENGTH:
+        errors.append(f"Email is too long (max {MAX_EMAIL_LENGTH} characters)")
+    if len(name) > MAX_NAME_LENGTH:
+        errors.append(f"Name is too long (max {MAX_NAME_LENGTH} characters)")
+    if len(password) > MAX_PASSWORD_LENGTH:
+        errors.append(f"Password is too long (max {MAX_PASSWORD_LENGTH} characters)")
+    if errors:
+        return errors
+
+    if not is_valid_email(email):
+        errors.append("Invalid email format")
+
+    clean_name = name.strip()
+    if len(clean_name) < 2:
+        errors.append("Name must be at least 2 characters")
+    if not NAME_REGEX.match(clean_name):
+        errors.append("Name must contain only letters, spaces, hyphens, and apostrophes")
+
+    is_pass_valid, pass_msg = is_valid_password(password)
+    if not is_pass_valid:
+        errors.append(pass_msg)
+
+    if confirm is not None and password != confirm:
+        errors.append("Passwords do not match")
+    return errors
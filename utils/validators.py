@@ -18,6 +18,9 @@ class InputValidator:
     }
     
     MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+
+    EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+    NAME_PATTERN = re.compile(r'^[A-Za-z\s\-\'\.]+$')
     
     @staticmethod
     def validate_email(email: str) -> Tuple[bool, str]:
@@ -30,8 +33,7 @@ class InputValidator:
         if len(email) > 254:
             return False, "Email is too long (max 254 characters)"
         
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not re.match(pattern, email):
+        if not InputValidator.EMAIL_PATTERN.match(email):
             return False, "Invalid email format"
         
         return True, ""
@@ -48,13 +50,26 @@ class InputValidator:
         if len(password) > 128:
             return False, "Password is too long (max 128 characters)"
         
-        if not any(char.isdigit() for char in password):
+        has_digit = has_upper = has_lower = False
+        for char in password:
+            if char.isdigit():
+                has_digit = True
+            elif char.isupper():
+                has_upper = True
+            elif char.islower():
+                has_lower = True
+            else:
+                continue
+            if has_digit and has_upper and has_lower:
+                break
+        
+        if not has_digit:
             return False, "Password must contain at least one number"
         
-        if not any(char.isupper() for char in password):
+        if not has_upper:
             return False, "Password must contain at least one uppercase letter"
         
-        if not any(char.islower() for char in password):
+        if not has_lower:
             return False, "Password must contain at least one lowercase letter"
         
         # Check for common weak passwords
@@ -74,7 +89,7 @@ class InputValidator:
             return False, "Name is too long (max 100 characters)"
         
         # Allow letters, spaces, hyphens, apostrophes
-        if not re.match(r'^[A-Za-z\s\-\'\.]+$', name):
+        if not InputValidator.NAME_PATTERN.match(name):
             return False, "Name can only contain letters, spaces, hyphens, and apostrophes"
         
         return True, ""